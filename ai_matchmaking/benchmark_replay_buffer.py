@@ -0,0 +1,118 @@
+"""Benchmark PersistentReplayBuffer append, sampling and restart
+
+Measures:
+- append throughput of add(), including the background compression of cold segments
+- sampling latency for batches drawn only from hot (memory-mapped) segments,
+  only from cold (compressed) segments, and for regular uniform sample() calls
+- restart time: reopening the buffer directory
+
+States are shaped like DQNModel.create_state_vector output (one-hot features
+plus a few random scores), so cold segments compress as real data would.
+
+Usage:
+    python benchmark_replay_buffer.py --directory /tmp/replay_bench [--transitions 50000000]
+"""
+import argparse
+import shutil
+import time
+
+import numpy as np
+
+from replay_buffer import PersistentReplayBuffer
+
+STATE_SIZE = 20
+
+
+def make_states(count: int, rng: np.random.Generator) -> np.ndarray:
+    """Generate state vectors with the layout used by DQNModel.create_state_vector"""
+    states = np.zeros((count, STATE_SIZE), dtype=np.float32)
+    rows = np.arange(count)
+    states[:, 0] = rng.integers(1, 6, count) / 5.0
+    states[rows, rng.integers(1, 8, count)] = 1.0
+    states[rows, rng.integers(8, 13, count)] = 1.0
+    states[rows, rng.integers(13, 17, count)] = 1.0
+    states[:, 17:] = rng.random((count, 3))
+    return states
+
+
+def time_batches(buffer: PersistentReplayBuffer, low: int, high: int,
+                 batch_size: int, batches: int) -> float:
+    """Return mean milliseconds to gather batches drawn from global indices [low, high)"""
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(batches):
+        indices = np.sort(low + rng.choice(high - low, batch_size, replace=False))
+        with buffer._lock:
+            buffer._gather(indices)
+    return (time.perf_counter() - start) / batches * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--directory", required=True)
+    parser.add_argument("--transitions", type=int, default=50000000)
+    parser.add_argument("--segment-size", type=int, default=100000)
+    parser.add_argument("--hot-segments", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--batches", type=int, default=200)
+    args = parser.parse_args()
+
+    shutil.rmtree(args.directory, ignore_errors=True)
+    options = dict(capacity=args.transitions, state_size=STATE_SIZE,
+                   segment_size=args.segment_size, hot_segments=args.hot_segments,
+                   chunk_size=args.chunk_size)
+    buffer = PersistentReplayBuffer(args.directory, **options)
+
+    # Cycle through a pool of pregenerated transitions so generation is not timed
+    rng = np.random.default_rng(0)
+    pool = 4096
+    states = make_states(pool, rng)
+    next_states = make_states(pool, rng)
+    actions = rng.integers(0, 2, pool)
+    rewards = rng.uniform(-1, 1, pool).astype(np.float32)
+
+    start = time.perf_counter()
+    for i in range(args.transitions):
+        j = i % pool
+        buffer.add(states[j], actions[j], rewards[j], next_states[j], False)
+        if i and i % 5000000 == 0:
+            elapsed = time.perf_counter() - start
+            print(f"  {i:>11,d} transitions, {i / elapsed:,.0f}/s")
+    append_seconds = time.perf_counter() - start
+    buffer.wait_for_compression()
+    total_seconds = time.perf_counter() - start
+
+    print(f"append:  {args.transitions / append_seconds:,.0f} transitions/s "
+          f"({append_seconds:.1f} s, {total_seconds:.1f} s including pending compression)")
+    print(f"disk:    {buffer.disk_bytes / 1e9:.2f} GB in {len(buffer.segment_ids)} segments")
+
+    # Global index ranges covered by hot and cold segments
+    with buffer._lock:
+        cold_size = sum(buffer.counts[segment_id] for segment_id in buffer.segment_ids
+                        if segment_id not in buffer.hot)
+    if len(buffer) > cold_size:
+        hot_ms = time_batches(buffer, cold_size, len(buffer), args.batch_size, args.batches)
+        print(f"sample:  hot  {hot_ms:8.3f} ms per batch of {args.batch_size}")
+    if cold_size:
+        cold_ms = time_batches(buffer, 0, cold_size, args.batch_size, args.batches)
+        print(f"sample:  cold {cold_ms:8.3f} ms per batch of {args.batch_size}")
+
+    start = time.perf_counter()
+    for _ in range(args.batches):
+        buffer.sample(args.batch_size)
+    print(f"sample:  uniform {(time.perf_counter() - start) / args.batches * 1000:8.3f} ms "
+          f"per batch of {args.batch_size}")
+
+    buffer.close()
+    del buffer
+
+    start = time.perf_counter()
+    reloaded = PersistentReplayBuffer(args.directory, **options)
+    restart_seconds = time.perf_counter() - start
+    print(f"restart: {restart_seconds * 1000:.1f} ms for {len(reloaded):,d} transitions")
+    reloaded.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Compare /matchmake response serialization paths
+
+Measures per-response CPU time and body size for:
+- pydantic: the previous path (AIPlayer/MatchQuality models returned in a dict,
+  then jsonable_encoder + JSONResponse, as FastAPI does without a response_model)
+- json: prevalidated dicts encoded by FastJSONResponse (orjson if installed)
+- msgpack: prevalidated dicts with columnar teams encoded by MsgPackResponse
+
+Usage:
+    python benchmark_serialization.py [--iterations 20000] [--team-size 5]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+import serialization
+from serialization import make_player, make_match_quality, render_matchmaking_response
+
+
+# Response models of the previous pydantic path, kept here for comparison only
+class AIPlayer(BaseModel):
+    id: str
+    name: str
+    position: str
+    skillLevel: int
+    winRate: float
+
+class MatchQuality(BaseModel):
+    skill_balance: float
+    synergy: float
+    availability: float
+    location: float
+    position_balance: float
+
+
+def random_players(count: int) -> List[dict]:
+    """Generate raw player data shaped like the mock players in main.py"""
+    positions = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+    return [{
+        "id": f"player_{i}",
+        "name": f"Player {i}",
+        "position": random.choice(positions),
+        "skillLevel": random.randint(1, 5),
+        "winRate": random.uniform(0.4, 0.8)
+    } for i in range(count)]
+
+
+QUALITY = {"skill_balance": 92.0, "synergy": 78.5, "availability": 100.0,
+           "location": 100.0, "position_balance": 88.1}
+EXPLANATION = "Teams are well-balanced by skill, players have decent synergy."
+
+
+def pydantic_path(players: List[dict], team_size: int) -> bytes:
+    team = [AIPlayer(**player) for player in players]
+    content = {
+        "team_A": team[:team_size],
+        "team_B": team[team_size:],
+        "confidence_score": 87.5,
+        "match_quality": MatchQuality(**QUALITY),
+        "explanation": EXPLANATION
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def plain_content(players: List[dict], team_size: int) -> dict:
+    team = [make_player(player["id"], player["name"], player["position"],
+                        player["skillLevel"], player["winRate"]) for player in players]
+    return {
+        "team_A": team[:team_size],
+        "team_B": team[team_size:],
+        "confidence_score": 87.5,
+        "match_quality": make_match_quality(**QUALITY),
+        "explanation": EXPLANATION
+    }
+
+
+def json_path(players: List[dict], team_size: int) -> bytes:
+    return render_matchmaking_response(plain_content(players, team_size), "application/json").body
+
+
+def msgpack_path(players: List[dict], team_size: int) -> bytes:
+    return render_matchmaking_response(plain_content(players, team_size),
+                                       serialization.MSGPACK_MEDIA_TYPE).body
+
+
+def measure(name: str, path: Callable[[List[dict], int], bytes],
+            players: List[dict], team_size: int, iterations: int):
+    """Print CPU microseconds per response and body size for one path"""
+    body = path(players, team_size)
+
+    start = time.process_time()
+    for _ in range(iterations):
+        path(players, team_size)
+    elapsed = time.process_time() - start
+
+    print(f"{name:<10} {elapsed / iterations * 1e6:10.1f} us/response {len(body):8d} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--team-size", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    players = random_players(args.team_size * 2)
+
+    print(f"JSON encoder: {'orjson' if serialization.orjson is not None else 'json (stdlib)'}")
+    measure("pydantic", pydantic_path, players, args.team_size, args.iterations)
+    measure("json", json_path, players, args.team_size, args.iterations)
+    if serialization.msgpack is not None:
+        measure("msgpack", msgpack_path, players, args.team_size, args.iterations)
+    else:
+        print("msgpack    not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -285,13 +285,26 @@ class DQNModel:
         
         print(f"Model weights saved to {filepath}")
     
+    def load_weights(self, filepath: str):
+        """Load model weights from file into both networks, raising on failure"""
+        self.main_network.load_weights(filepath)
+        self.target_network.load_weights(filepath)
+        print(f"Model weights loaded from {filepath}")
+    
+    def copy_weights_from(self, other: "DQNModel"):
+        """Copy main and target network weights from another model"""
+        self.main_network.set_weights(other.main_network.get_weights())
+        self.target_network.set_weights(other.target_network.get_weights())
+    
+    def warm_up(self):
+        """Run a dummy prediction so the first real request does not pay graph tracing costs"""
+        self.main_network.predict(np.zeros((1, STATE_SIZE)), verbose=0)
+    
     def load_weights_if_exists(self, filepath: str = "models/latest_model.weights.h5"):
         """Load model weights if file exists"""
         if os.path.exists(filepath):
             try:
-                self.main_network.load_weights(filepath)
-                self.target_network.load_weights(filepath)
-                print(f"Model weights loaded from {filepath}")
+                self.load_weights(filepath)
                 return True
             except Exception as e:
                 print(f"Error loading model weights: {e}")
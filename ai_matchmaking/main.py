@@ -1,14 +1,18 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
 import uvicorn
 import os
 import random
+import threading
 
 # Import our DQN model and replay buffer
-from dqn_model import DQNModel
-from replay_buffer import ReplayBuffer
+from dqn_model import STATE_SIZE, BATCH_SIZE
+from replay_buffer import PersistentReplayBuffer
+from model_registry import ModelRegistry
+from serialization import make_player, make_match_quality, render_matchmaking_response
 
 # Create FastAPI app
 app = FastAPI(
@@ -26,9 +30,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize our DQN model and replay buffer
-dqn_model = DQNModel()
-replay_buffer = ReplayBuffer(capacity=10000)
+# Initialize the model registry (serves the active DQN model) and replay buffer
+model_registry = ModelRegistry(
+    models_dir="models",
+    keep_versions=int(os.getenv("MODEL_KEEP_VERSIONS", "10"))
+)
+# Experiences are persisted to disk so they survive restarts; the size (bytes)
+# and age (seconds) limits are off unless set
+replay_buffer_max_bytes = os.getenv("REPLAY_BUFFER_MAX_BYTES")
+replay_buffer_max_age = os.getenv("REPLAY_BUFFER_MAX_AGE")
+replay_buffer = PersistentReplayBuffer(
+    directory=os.getenv("REPLAY_BUFFER_DIR", "replay_data"),
+    capacity=int(os.getenv("REPLAY_BUFFER_CAPACITY", "1000000")),
+    state_size=STATE_SIZE,
+    max_bytes=int(replay_buffer_max_bytes) if replay_buffer_max_bytes else None,
+    max_age=float(replay_buffer_max_age) if replay_buffer_max_age else None
+)
+
+# Serializes replay buffer appends and training steps, which run in the threadpool
+training_lock = threading.Lock()
+
+def record_and_train(current_state, reward, next_state):
+    """Store an experience, train on the replay buffer and save a new checkpoint version"""
+    with training_lock:
+        # Add experience to replay buffer (may roll over a segment file)
+        action = 1  # 1 for join match, 0 for reject match
+        replay_buffer.add(current_state, action, reward, next_state, False)
+        
+        # Nothing to train on until the buffer holds a full batch
+        if len(replay_buffer) < BATCH_SIZE:
+            return
+        
+        # Train a copy of the served model, save it as a new checkpoint version and
+        # swap it in; the model /matchmake is using is never modified in place
+        model_registry.train(lambda model: model.train(replay_buffer))
 
 # Helper functions for match quality calculations
 def generate_mock_players(sport):
@@ -63,13 +98,13 @@ def generate_mock_players(sport):
         skill_level = random.randint(1, 5)
         win_rate = random.uniform(0.4, 0.8)
         
-        # Create player object
-        player = AIPlayer(
-            id=f"player_{i}",
+        # Create player dict (prevalidated, so it skips pydantic on the response path)
+        player = make_player(
+            player_id=f"player_{i}",
             name=f"{first_name} {last_name}",
             position=position,
-            skillLevel=skill_level,
-            winRate=win_rate
+            skill_level=skill_level,
+            win_rate=win_rate
         )
         
         mock_players.append(player)
@@ -78,8 +113,8 @@ def generate_mock_players(sport):
 
 def calculate_skill_balance(team_a, team_b):
     """Calculate skill balance between two teams (0-100)"""
-    avg_skill_a = sum(player.skillLevel for player in team_a) / len(team_a) if team_a else 0
-    avg_skill_b = sum(player.skillLevel for player in team_b) / len(team_b) if team_b else 0
+    avg_skill_a = sum(player["skillLevel"] for player in team_a) / len(team_a) if team_a else 0
+    avg_skill_b = sum(player["skillLevel"] for player in team_b) / len(team_b) if team_b else 0
     
     # Perfect balance is 0 difference
     diff = abs(avg_skill_a - avg_skill_b)
@@ -93,8 +128,8 @@ def calculate_synergy(team_a, team_b):
     """Calculate team synergy based on win rates (0-100)"""
     # This is a simplified calculation - in a real system, you'd use historical match data
     # For now, we'll use a random value between 50-100 with some influence from win rates
-    team_a_synergy = sum(player.winRate for player in team_a) / len(team_a) if team_a else 0
-    team_b_synergy = sum(player.winRate for player in team_b) / len(team_b) if team_b else 0
+    team_a_synergy = sum(player["winRate"] for player in team_a) / len(team_a) if team_a else 0
+    team_b_synergy = sum(player["winRate"] for player in team_b) / len(team_b) if team_b else 0
     
     # Average synergy with some randomness
     avg_synergy = (team_a_synergy + team_b_synergy) * 50  # Scale to 0-100
@@ -113,26 +148,26 @@ def generate_match_explanation(match_quality):
     """Generate a human-readable explanation of match quality"""
     explanations = []
     
-    if match_quality.skill_balance > 90:
+    if match_quality["skill_balance"] > 90:
         explanations.append("Teams are well-balanced by skill")
-    elif match_quality.skill_balance > 70:
+    elif match_quality["skill_balance"] > 70:
         explanations.append("Teams have good skill balance")
     else:
         explanations.append("Teams have some skill imbalance")
         
-    if match_quality.synergy > 80:
+    if match_quality["synergy"] > 80:
         explanations.append("players have excellent synergy")
-    elif match_quality.synergy > 60:
+    elif match_quality["synergy"] > 60:
         explanations.append("players have decent synergy")
     else:
         explanations.append("synergy can be improved")
         
-    if match_quality.availability > 90 and match_quality.location > 90:
+    if match_quality["availability"] > 90 and match_quality["location"] > 90:
         explanations.append("availability and location are optimal")
     
-    if match_quality.position_balance > 90:
+    if match_quality["position_balance"] > 90:
         explanations.append("positions are well-distributed")
-    elif match_quality.position_balance > 70:
+    elif match_quality["position_balance"] > 70:
         explanations.append("position balance is good")
     
     # Join explanations with commas and capitalize first letter
@@ -147,40 +182,8 @@ class MatchmakingRequest(BaseModel):
     location: str
     availability: str
 
-class PlayerMatch(BaseModel):
-    playerId: str
-    name: str
-    skillLevel: int
-    compatibility: float
-    sport: str
-    position: Optional[str] = "Auto-assigned"
-    winRate: Optional[float] = 0.5
-
-class MatchQuality(BaseModel):
-    skill_balance: float
-    synergy: float
-    availability: float
-    location: float
-    position_balance: float
-
-class AIPlayer(BaseModel):
-    id: str
-    name: str
-    position: str
-    skillLevel: int
-    winRate: float
-
-class MatchmakingResponse(BaseModel):
-    # Original response format
-    teammates: Optional[List[PlayerMatch]] = None
-    confidence: Optional[float] = None
-    
-    # New response format matching frontend expectations
-    team_A: Optional[List[AIPlayer]] = None
-    team_B: Optional[List[AIPlayer]] = None
-    confidence_score: Optional[float] = None
-    match_quality: Optional[MatchQuality] = None
-    explanation: Optional[str] = None
+class ModelVersionRequest(BaseModel):
+    version: Optional[int] = None  # Defaults to latest (reload) or previous (rollback)
 
 class UpdateRequest(BaseModel):
     playerId: str
@@ -190,14 +193,35 @@ class UpdateRequest(BaseModel):
     teammates: List[str]  # List of teammate IDs
     opponents: List[str]  # List of opponent IDs
 
+@app.on_event("startup")
+async def startup():
+    # Create models directory if it doesn't exist
+    os.makedirs("models", exist_ok=True)
+    
+    # Load the latest versioned checkpoint, or legacy weights if there are none
+    await run_in_threadpool(model_registry.load_latest, "models/latest_model.weights.h5")
+    
+    # Hot reload checkpoints written by other processes (0 disables the watcher)
+    watch_interval = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+    if watch_interval > 0:
+        model_registry.start_watching(watch_interval)
+
+@app.on_event("shutdown")
+async def shutdown():
+    model_registry.stop_watching()
+    replay_buffer.close()
+
 # Endpoints
 @app.get("/")
 async def root():
     return {"message": "Welcome to TurfX AI Matchmaking Service"}
 
 @app.post("/matchmake")
-async def matchmake(request: MatchmakingRequest):
+async def matchmake(request: MatchmakingRequest, accept: Optional[str] = Header(None)):
     try:
+        # Pin the active model for the whole request so a hot swap cannot split it
+        dqn_model = model_registry.active
+        
         # Convert request to state vector
         state = dqn_model.create_state_vector(
             player_id=request.playerId,
@@ -221,7 +245,7 @@ async def matchmake(request: MatchmakingRequest):
             team_b = mock_players[half_length:]
             
             # Calculate match quality metrics
-            match_quality = MatchQuality(
+            match_quality = make_match_quality(
                 skill_balance=calculate_skill_balance(team_a, team_b),
                 synergy=calculate_synergy(team_a, team_b),
                 availability=100.0,  # Assuming perfect availability match
@@ -233,42 +257,42 @@ async def matchmake(request: MatchmakingRequest):
             explanation = generate_match_explanation(match_quality)
             
             # Return in the format expected by frontend
-            return {
+            return render_matchmaking_response({
                 "team_A": team_a,
                 "team_B": team_b,
                 "confidence_score": 87.5,  # Mock confidence score
                 "match_quality": match_quality,
                 "explanation": explanation
-            }
+            }, accept)
         
         # Split teammates into two teams
         half_length = len(teammates) // 2
         team_a_players = teammates[:half_length]
         team_b_players = teammates[half_length:]
         
-        # Convert to AIPlayer format
+        # Convert teammates (plain dicts from the model) to the player response format
         team_a = [
-            AIPlayer(
-                id=player.playerId,
-                name=player.name,
+            make_player(
+                player_id=player["playerId"],
+                name=player["name"],
                 position="Auto-assigned",
-                skillLevel=player.skillLevel,
-                winRate=player.compatibility
+                skill_level=player["skillLevel"],
+                win_rate=player["compatibility"]
             ) for player in team_a_players
         ]
         
         team_b = [
-            AIPlayer(
-                id=player.playerId,
-                name=player.name,
+            make_player(
+                player_id=player["playerId"],
+                name=player["name"],
                 position="Auto-assigned",
-                skillLevel=player.skillLevel,
-                winRate=player.compatibility
+                skill_level=player["skillLevel"],
+                win_rate=player["compatibility"]
             ) for player in team_b_players
         ]
         
         # Calculate match quality metrics
-        match_quality = MatchQuality(
+        match_quality = make_match_quality(
             skill_balance=calculate_skill_balance(team_a, team_b),
             synergy=calculate_synergy(team_a, team_b),
             availability=100.0,  # Assuming perfect availability match
@@ -280,19 +304,21 @@ async def matchmake(request: MatchmakingRequest):
         explanation = generate_match_explanation(match_quality)
         
         # Return in the new format expected by frontend
-        return {
+        return render_matchmaking_response({
             "team_A": team_a,
             "team_B": team_b,
             "confidence_score": confidence * 100,  # Convert to percentage
             "match_quality": match_quality,
             "explanation": explanation
-        }
+        }, accept)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/update")
 async def update(request: UpdateRequest):
     try:
+        dqn_model = model_registry.active
+        
         # Get current state
         current_state = dqn_model.get_player_state(request.playerId, request.sport)
         
@@ -305,20 +331,40 @@ async def update(request: UpdateRequest):
             opponents=request.opponents
         )
         
-        # Add experience to replay buffer
-        action = 1  # 1 for join match, 0 for reject match
-        replay_buffer.add(current_state, action, request.reward, next_state, False)
-        
-        # Train the model
-        dqn_model.train(replay_buffer)
-        
-        # Save the model weights periodically
-        dqn_model.save_weights()
+        # Record, train and save off the event loop so /matchmake keeps being served
+        await run_in_threadpool(record_and_train, current_state, request.reward, next_state)
         
         return {"message": "Model updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/models")
+async def get_model_versions():
+    return model_registry.status()
+
+@app.post("/models/reload")
+async def reload_model(request: Optional[ModelVersionRequest] = None):
+    try:
+        # Load and warm the standby model off the event loop so requests keep flowing
+        version = await run_in_threadpool(model_registry.reload, request.version if request else None)
+        return {"message": "Model reloaded successfully", "active_version": version}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/models/rollback")
+async def rollback_model(request: Optional[ModelVersionRequest] = None):
+    try:
+        version = await run_in_threadpool(model_registry.rollback, request.version if request else None)
+        return {"message": "Model rolled back successfully", "active_version": version}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/sports")
 async def get_supported_sports():
     return {
@@ -334,11 +380,6 @@ async def get_supported_sports():
     }
 
 if __name__ == "__main__":
-    # Create models directory if it doesn't exist
-    os.makedirs("models", exist_ok=True)
-    
-    # Load model weights if they exist
-    dqn_model.load_weights_if_exists()
-    
+    # Model weights are loaded by the startup handler
     # Run the FastAPI app
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,323 @@
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any
+
+if TYPE_CHECKING:
+    from dqn_model import DQNModel
+
+CHECKPOINT_PATTERN = re.compile(r"^dqn_model_v(\d+)\.weights\.h5$")
+# Checkpoints are written under this prefix and renamed into place, so the
+# watcher never sees a partially written file
+TMP_PREFIX = "tmp_"
+
+
+class ModelRegistry:
+    """Versioned weight registry with hot reload and rollback
+
+    Checkpoints are stored as models/dqn_model_v<version>.weights.h5 with
+    monotonically increasing versions. Requests read the serving model from
+    `active`; a reload loads the new weights into a standby DQNModel, warms it
+    up and then swaps the reference in a single assignment, so in-flight
+    requests finish on the model they started with. Training works the same
+    way on a copy of the active model, which is never modified in place.
+    """
+
+    def __init__(self, models_dir: str = "models",
+                 model_factory: Optional[Callable[[], "DQNModel"]] = None,
+                 initial_model: Optional["DQNModel"] = None,
+                 keep_versions: int = 10):
+        """Initialize the registry
+
+        Args:
+            models_dir: Directory holding versioned checkpoints
+            model_factory: Callable that builds a fresh (standby) model, defaults to DQNModel
+            initial_model: Model to serve until a checkpoint is loaded
+            keep_versions: Number of newest checkpoints kept on disk besides
+                the active and previous ones
+        """
+        if model_factory is None:
+            from dqn_model import DQNModel
+            model_factory = DQNModel
+
+        self.models_dir = models_dir
+        self.model_factory = model_factory
+        self.keep_versions = keep_versions
+        self.active = initial_model if initial_model is not None else model_factory()
+        self.active_version = None
+        # Previously served model, kept warm so rollback is a plain swap
+        self.previous = None
+        self.previous_version = None
+        # Highest checkpoint version already saved or loaded by this process; the
+        # watcher only reacts to newer ones, so it never undoes a rollback
+        self.last_seen_version = None
+        # _lock guards the active/previous references and version numbering and
+        # is only held for short sections; _reload_lock and _train_lock serialize
+        # building standby and training models
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    def checkpoint_path(self, version: int) -> str:
+        """Return the checkpoint file path for a version"""
+        return os.path.join(self.models_dir, f"dqn_model_v{version:06d}.weights.h5")
+
+    def list_versions(self) -> List[int]:
+        """Return all checkpoint versions found on disk, oldest first"""
+        if not os.path.isdir(self.models_dir):
+            return []
+
+        versions = []
+        for filename in os.listdir(self.models_dir):
+            match = CHECKPOINT_PATTERN.match(filename)
+            if match:
+                versions.append(int(match.group(1)))
+
+        return sorted(versions)
+
+    def latest_version(self) -> Optional[int]:
+        """Return the newest checkpoint version, or None if there are none"""
+        versions = self.list_versions()
+        return versions[-1] if versions else None
+
+    def _mark_seen(self, version: int):
+        if self.last_seen_version is None or version > self.last_seen_version:
+            self.last_seen_version = version
+
+    def save(self, model: Optional["DQNModel"] = None) -> Optional[int]:
+        """Save the active model weights as the next checkpoint version
+
+        The new version is marked active, so the watcher does not reload
+        weights this process has just written. A model that was swapped out
+        while it was training is not saved, since its checkpoint would
+        supersede the version that replaced it.
+
+        Args:
+            model: Model to save, defaults to the active model
+
+        Returns:
+            The new checkpoint version, or None if the model is no longer active
+        """
+        with self._lock:
+            model = model if model is not None else self.active
+            if model is not self.active:
+                return None
+
+            version = self._write_checkpoint(model)
+            self.active_version = version
+            self._prune()
+            return version
+
+    def _write_checkpoint(self, model: "DQNModel") -> int:
+        """Atomically write model weights as the next checkpoint version
+
+        The version is marked seen before anything is written, and the weights
+        go to a temporary .h5 file that is renamed into place, so the watcher
+        never loads this process's own checkpoints. Callers must hold _lock.
+        """
+        version = max(self.latest_version() or 0, self.last_seen_version or 0) + 1
+        self._mark_seen(version)
+
+        os.makedirs(self.models_dir, exist_ok=True)
+        filepath = self.checkpoint_path(version)
+        tmp_filepath = os.path.join(self.models_dir, TMP_PREFIX + os.path.basename(filepath))
+        model.save_weights(tmp_filepath)
+        os.replace(tmp_filepath, filepath)
+        return version
+
+    def train(self, train_fn: Callable[["DQNModel"], None]) -> Optional[int]:
+        """Train a copy of the active model and swap it in as a new checkpoint version
+
+        The copy gets the active model's weights and shared player data, is
+        trained by train_fn, saved and warmed up, then replaces the active
+        model. The previous (rollback) model is left unchanged. If a reload or
+        rollback replaces the active model meanwhile, the result is discarded.
+
+        Args:
+            train_fn: Callable that trains the model it is given
+
+        Returns:
+            The new checkpoint version, or None if the result was discarded
+        """
+        with self._train_lock:
+            base = self.active
+
+            candidate = self.model_factory()
+            candidate.copy_weights_from(base)
+            candidate.player_states = base.player_states
+            candidate.mock_players = base.mock_players
+
+            train_fn(candidate)
+            candidate.warm_up()
+
+            with self._lock:
+                if self.active is not base:
+                    return None
+
+                version = self._write_checkpoint(candidate)
+                self._swap(candidate, version, replace_previous=False)
+                self._prune()
+                return version
+
+    def _prune(self):
+        """Delete checkpoints beyond the retention limit, keeping active and previous"""
+        keep = set(self.list_versions()[-self.keep_versions:]) if self.keep_versions > 0 else set()
+        keep.update({self.active_version, self.previous_version})
+
+        for version in self.list_versions():
+            if version not in keep:
+                try:
+                    os.remove(self.checkpoint_path(version))
+                except FileNotFoundError:
+                    pass
+
+    def _build_standby(self, version: int) -> "DQNModel":
+        """Load a checkpoint into a new model and warm it up"""
+        filepath = self.checkpoint_path(version)
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"Model checkpoint v{version} not found at {filepath}")
+
+        standby = self.model_factory()
+        standby.load_weights(filepath)
+
+        # Share player data with the serving model so the swap is invisible to clients
+        standby.player_states = self.active.player_states
+        standby.mock_players = self.active.mock_players
+
+        standby.warm_up()
+        return standby
+
+    def _swap(self, model: "DQNModel", version: Optional[int], replace_previous: bool = True):
+        """Make a model the active one, keeping the old one for rollback
+
+        Callers must hold _lock.
+        """
+        if replace_previous:
+            self.previous, self.previous_version = self.active, self.active_version
+        self.active, self.active_version = model, version
+        print(f"Serving model version {version}")
+
+    def reload(self, version: Optional[int] = None) -> Optional[int]:
+        """Load a checkpoint into a standby model and swap it in
+
+        The standby model is built and warmed without holding the lock used by
+        save() and rollback(), so they never wait for a reload; only the
+        reference swap itself is locked.
+
+        Args:
+            version: Version to load, defaults to the latest checkpoint
+
+        Returns:
+            The version now being served, or None if there was nothing to load
+        """
+        with self._reload_lock:
+            if version is None:
+                version = self.latest_version()
+                if version is None:
+                    return self.active_version
+
+            if version == self.active_version:
+                return version
+
+            standby = self._build_standby(version)
+
+            with self._lock:
+                self._swap(standby, version)
+                self._mark_seen(version)
+
+            return version
+
+    def rollback(self, version: Optional[int] = None) -> Optional[int]:
+        """Return to the previously served model, or to a specific version
+
+        Rollback is refused while the watcher is running and a checkpoint it
+        has not handled yet is on disk, since the watcher would swap that
+        checkpoint in on its next poll.
+
+        Args:
+            version: Version to roll back to, defaults to the previous model
+
+        Returns:
+            The version now being served
+        """
+        if self.is_watching():
+            latest = self.latest_version()
+            if latest is not None and (self.last_seen_version is None or latest > self.last_seen_version):
+                raise ValueError(
+                    f"Model version {latest} is pending hot reload; stop the watcher or "
+                    f"wait for it to load before rolling back"
+                )
+
+        if version is not None:
+            return self.reload(version)
+
+        with self._lock:
+            if self.previous is None:
+                raise ValueError("No previous model version to roll back to")
+
+            self._swap(self.previous, self.previous_version)
+            return self.active_version
+
+    def load_latest(self, legacy_filepath: Optional[str] = None) -> Optional[int]:
+        """Load the latest checkpoint into the active model at startup
+
+        Falls back to a legacy unversioned weights file when the registry is empty.
+        """
+        if self.latest_version() is not None:
+            return self.reload()
+
+        if legacy_filepath is not None:
+            self.active.load_weights_if_exists(legacy_filepath)
+        return None
+
+    def is_watching(self) -> bool:
+        """Return True if the background watcher thread is running"""
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        """Return the registry state for the admin endpoints"""
+        return {
+            "active_version": self.active_version,
+            "previous_version": self.previous_version,
+            "versions": self.list_versions(),
+            "watching": self.is_watching()
+        }
+
+    def check_for_update(self) -> Optional[int]:
+        """Reload the newest checkpoint if it is newer than any version already handled
+
+        Returns:
+            The version that was loaded, or None if there was nothing new
+        """
+        latest = self.latest_version()
+        if latest is None or (self.last_seen_version is not None and latest <= self.last_seen_version):
+            return None
+
+        return self.reload(latest)
+
+    def _watch(self, interval: float):
+        """Poll the models directory and hot reload newer checkpoints"""
+        while not self._stop_watching.wait(interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                print(f"Error hot reloading model weights: {e}")
+
+    def start_watching(self, interval: float = 10.0):
+        """Start a background thread that reloads new checkpoints as they appear"""
+        if self.is_watching():
+            return
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                         name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background watcher thread"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -1,7 +1,13 @@
 import numpy as np
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
 import random
-from typing import Tuple, List
+import re
+import threading
+import time
+import zlib
+from typing import Tuple, List, Optional
 
 class ReplayBuffer:
     """Experience replay buffer for DQN training"""
@@ -60,4 +66,361 @@ class ReplayBuffer:
     
     def clear(self):
         """Clear all experiences from the buffer"""
-        self.buffer.clear()
\ No newline at end of file
+        self.buffer.clear()
+
+
+# Segment files: hot segments are raw .npy files opened as memory maps. Cold
+# segments are .chunks files whose name records the transition count; they
+# start with a uint64 table of chunk offsets followed by the independently
+# zlib-compressed chunks.
+HOT_SEGMENT_PATTERN = re.compile(r"^segment_(\d+)\.npy$")
+COLD_SEGMENT_PATTERN = re.compile(r"^segment_(\d+)_(\d+)\.chunks$")
+TMP_SUFFIX = ".tmp"
+COMPRESSION_LEVEL = 1  # Fast enough for the compressor to keep up with appends
+
+
+class PersistentReplayBuffer:
+    """Disk-backed experience replay buffer that survives restarts
+
+    Transitions are appended to fixed-size segment files in `directory`. The
+    newest `hot_segments` segments (including the one being written) are raw
+    memory-mapped .npy files, so appends and sampling from them never copy the
+    data into RAM. Older segments are compressed on a background thread in
+    `chunk_size`-record chunks; sampling a cold transition only reads and
+    decompresses the chunk that holds it. Whole segments are evicted,
+    oldest first, once the buffer exceeds `capacity`, `max_bytes` or
+    `max_age`. These limits are checked on every add() and sample().
+
+    Because eviction drops whole segments, a full buffer holds between
+    `capacity` and `capacity + segment_size - 1` experiences; `segment_size`
+    is capped at `capacity`, so this is never more than twice the capacity.
+
+    Startup only lists the directory and opens the hot memory maps, so reload
+    time depends on the number of segments, not on the number of transitions.
+    """
+
+    def __init__(self, directory: str, capacity: int = 1000000, state_size: int = 20,
+                 segment_size: int = 100000, hot_segments: int = 4, chunk_size: int = 256,
+                 max_bytes: Optional[int] = None, max_age: Optional[float] = None):
+        """Initialize the buffer, reloading any segments already on disk
+
+        Args:
+            directory: Directory holding the segment files
+            capacity: Number of experiences to keep; up to segment_size - 1 more
+                are kept until the oldest segment can be dropped whole
+            state_size: Length of the state vectors
+            segment_size: Number of experiences per segment file, at most capacity
+            hot_segments: Number of newest segments kept memory-mapped
+            chunk_size: Number of experiences per compressed chunk of a cold segment
+            max_bytes: Optional limit on the total size of the segment files
+            max_age: Optional limit in seconds on the time since a segment was filled
+        """
+        self.directory = directory
+        self.capacity = max(1, capacity)
+        self.segment_size = max(1, min(segment_size, self.capacity))
+        self.hot_segments = max(1, hot_segments)
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.dtype = np.dtype([
+            ("state", np.float32, (state_size,)),
+            ("action", np.int8),
+            ("reward", np.float32),
+            ("next_state", np.float32, (state_size,)),
+            ("done", np.bool_),
+            ("valid", np.bool_)  # Set on append, used to recover the fill level
+        ])
+        self.rng = np.random.default_rng()
+
+        # Segment ids oldest first, with per-segment counts, file sizes and the
+        # time each segment was filled; hot segments map to their memory maps
+        self.segment_ids = []
+        self.counts = {}
+        self.file_sizes = {}
+        self.sealed_at = {}
+        self.hot = {}
+        self.size = 0
+        self.disk_bytes = 0
+        # Chunk offset tables of cold segments, read on first access
+        self.cold_offsets = {}
+
+        # The lock guards the segment index; compression runs on its own thread
+        # and only takes the lock to publish the finished cold segment
+        self._lock = threading.RLock()
+        self._compressing = set()
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replay-compressor")
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_segments()
+
+    def _hot_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment_id:08d}.npy")
+
+    def _cold_path(self, segment_id: int, count: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment_id:08d}_{count}.chunks")
+
+    def _segment_path(self, segment_id: int) -> str:
+        if segment_id in self.hot:
+            return self._hot_path(segment_id)
+        return self._cold_path(segment_id, self.counts[segment_id])
+
+    def _register(self, segment_id: int, count: int, path: str, sealed_at: Optional[float]):
+        file_size = os.path.getsize(path)
+        self.counts[segment_id] = count
+        self.file_sizes[segment_id] = file_size
+        if sealed_at is not None:
+            self.sealed_at[segment_id] = sealed_at
+        self.size += count
+        self.disk_bytes += file_size
+
+    def _load_segments(self):
+        """Rebuild the segment index from the files on disk"""
+        filenames = os.listdir(self.directory)
+
+        for filename in filenames:
+            if filename.endswith(TMP_SUFFIX):
+                # Leftover of an interrupted compression
+                os.remove(os.path.join(self.directory, filename))
+
+        for filename in filenames:
+            match = HOT_SEGMENT_PATTERN.match(filename)
+            if match:
+                segment_id = int(match.group(1))
+                path = os.path.join(self.directory, filename)
+                segment = np.load(path, mmap_mode="r+")
+                self.hot[segment_id] = segment
+                self._register(segment_id, int(np.count_nonzero(segment["valid"])), path,
+                               os.path.getmtime(path))
+
+        for filename in filenames:
+            match = COLD_SEGMENT_PATTERN.match(filename)
+            if match:
+                segment_id = int(match.group(1))
+                path = os.path.join(self.directory, filename)
+                if segment_id in self.hot:
+                    # Interrupted cleanup after compression, the hot copy is complete
+                    os.remove(path)
+                    continue
+                self._register(segment_id, int(match.group(2)), path, os.path.getmtime(path))
+
+        self.segment_ids = sorted(self.counts)
+        if self.segment_ids:
+            # The newest segment is still being filled
+            self.sealed_at.pop(self.segment_ids[-1], None)
+
+        with self._lock:
+            self._demote()
+            self._evict()
+
+    def _new_segment(self):
+        """Start a new memory-mapped segment and demote segments that are no longer hot"""
+        if self.segment_ids:
+            self.sealed_at[self.segment_ids[-1]] = time.time()
+
+        segment_id = self.segment_ids[-1] + 1 if self.segment_ids else 0
+        path = self._hot_path(segment_id)
+        self.hot[segment_id] = np.lib.format.open_memmap(
+            path, mode="w+", dtype=self.dtype, shape=(self.segment_size,)
+        )
+        self._register(segment_id, 0, path, None)
+        self.segment_ids.append(segment_id)
+
+        self._demote()
+
+    def _demote(self):
+        """Queue compression for hot segments that fell out of the hot window"""
+        for segment_id in self.segment_ids[:-self.hot_segments]:
+            if segment_id in self.hot and segment_id not in self._compressing:
+                self._compressing.add(segment_id)
+                self._compressor.submit(self._compress, segment_id, self.hot[segment_id])
+
+    def _compress(self, segment_id: int, segment: np.ndarray):
+        """Write a sealed hot segment as a chunked cold segment (runs on the compressor thread)"""
+        try:
+            with self._lock:
+                if self.hot.get(segment_id) is not segment:
+                    return
+                count = self.counts[segment_id]
+                sealed_at = self.sealed_at.get(segment_id)
+
+            # The segment is sealed, so its memory map can be read without the lock
+            cold_path = self._cold_path(segment_id, count)
+            tmp_path = cold_path + TMP_SUFFIX
+            chunks = [zlib.compress(segment[i:i + self.chunk_size].tobytes(), COMPRESSION_LEVEL)
+                      for i in range(0, count, self.chunk_size)]
+            table_bytes = (len(chunks) + 1) * 8
+            offsets = np.cumsum([table_bytes] + [len(chunk) for chunk in chunks], dtype=np.uint64)
+            with open(tmp_path, "wb") as f:
+                f.write(offsets.tobytes())
+                for chunk in chunks:
+                    f.write(chunk)
+
+            with self._lock:
+                if self.hot.get(segment_id) is not segment:
+                    # Evicted or cleared while compressing
+                    os.remove(tmp_path)
+                    return
+
+                # Restarts take the fill time from the file's mtime, so carry it over
+                if sealed_at is not None:
+                    os.utime(tmp_path, (sealed_at, sealed_at))
+                os.replace(tmp_path, cold_path)
+                del self.hot[segment_id]
+                os.remove(self._hot_path(segment_id))
+                file_size = os.path.getsize(cold_path)
+                self.disk_bytes += file_size - self.file_sizes[segment_id]
+                self.file_sizes[segment_id] = file_size
+        except Exception as e:
+            print(f"Error compressing replay buffer segment {segment_id}: {e}")
+        finally:
+            with self._lock:
+                self._compressing.discard(segment_id)
+
+    def _remove_segment(self, segment_id: int):
+        """Drop a segment from the index and delete its file"""
+        path = self._segment_path(segment_id)
+        self.segment_ids.remove(segment_id)
+        self.size -= self.counts.pop(segment_id)
+        self.disk_bytes -= self.file_sizes.pop(segment_id)
+        self.sealed_at.pop(segment_id, None)
+        self.hot.pop(segment_id, None)
+
+        self.cold_offsets.pop(segment_id, None)
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Drop the oldest segments while the capacity, size or age limits are exceeded"""
+        now = time.time()
+        while len(self.segment_ids) > 1:
+            oldest = self.segment_ids[0]
+
+            over_capacity = self.size - self.counts[oldest] >= self.capacity
+            over_size = self.max_bytes is not None and self.disk_bytes > self.max_bytes
+            too_old = self.max_age is not None and now - self.sealed_at[oldest] > self.max_age
+            if not (over_capacity or over_size or too_old):
+                break
+
+            self._remove_segment(oldest)
+
+    def _read_cold(self, segment_id: int, offsets: np.ndarray) -> np.ndarray:
+        """Read records of a cold segment, decompressing only the chunks that hold them"""
+        count = self.counts[segment_id]
+        records = np.empty(len(offsets), dtype=self.dtype)
+        chunk_ids = offsets // self.chunk_size
+
+        with open(self._cold_path(segment_id, count), "rb") as f:
+            chunk_offsets = self.cold_offsets.get(segment_id)
+            if chunk_offsets is None:
+                num_chunks = -(-count // self.chunk_size)
+                chunk_offsets = np.fromfile(f, dtype=np.uint64, count=num_chunks + 1).astype(np.int64)
+                self.cold_offsets[segment_id] = chunk_offsets
+
+            for chunk_id in np.unique(chunk_ids):
+                f.seek(chunk_offsets[chunk_id])
+                data = f.read(chunk_offsets[chunk_id + 1] - chunk_offsets[chunk_id])
+                chunk = np.frombuffer(zlib.decompress(data), dtype=self.dtype)
+                chunk_mask = chunk_ids == chunk_id
+                records[chunk_mask] = chunk[offsets[chunk_mask] - chunk_id * self.chunk_size]
+
+        return records
+
+    def _gather(self, indices: np.ndarray) -> np.ndarray:
+        """Read experiences by sorted global index, oldest experience first
+
+        Hot segments are read through their memory maps; for cold segments only
+        the chunks holding the requested experiences are decompressed.
+        """
+        counts = np.array([self.counts[segment_id] for segment_id in self.segment_ids])
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+        positions = np.searchsorted(starts, indices, side="right") - 1
+
+        batch = np.empty(len(indices), dtype=self.dtype)
+        for position in np.unique(positions):
+            mask = positions == position
+            segment_id = self.segment_ids[position]
+            offsets = indices[mask] - starts[position]
+
+            if segment_id in self.hot:
+                batch[mask] = self.hot[segment_id][offsets]
+                continue
+
+            batch[mask] = self._read_cold(segment_id, offsets)
+
+        return batch
+
+    def add(self, state: np.ndarray, action: int, reward: float,
+            next_state: np.ndarray, done: bool):
+        """Add an experience to the buffer
+
+        Args:
+            state: Current state vector
+            action: Action taken (0 or 1)
+            reward: Reward received
+            next_state: Next state vector
+            done: Whether the episode is done
+        """
+        with self._lock:
+            if not self.segment_ids or self.counts[self.segment_ids[-1]] >= self.segment_size:
+                self._new_segment()
+
+            segment_id = self.segment_ids[-1]
+            index = self.counts[segment_id]
+            self.hot[segment_id][index] = (state, action, reward, next_state, done, True)
+            self.counts[segment_id] = index + 1
+            self.size += 1
+
+            self._evict()
+
+    def sample(self, batch_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Sample a batch of experiences uniformly from all segments
+
+        Args:
+            batch_size: Number of experiences to sample
+
+        Returns:
+            Tuple of (states, actions, rewards, next_states, dones)
+        """
+        with self._lock:
+            self._evict()
+
+            # Ensure we have enough experiences
+            batch_size = min(batch_size, self.size)
+
+            # Generator.choice draws without replacement without permuting the whole range
+            indices = np.sort(self.rng.choice(self.size, batch_size, replace=False))
+            batch = self._gather(indices)
+
+            # Shuffle so the batch is not ordered by age
+            batch = self.rng.permutation(batch)
+
+        return (batch["state"], batch["action"].astype(np.int64), batch["reward"],
+                batch["next_state"], batch["done"].astype(np.float32))
+
+    def wait_for_compression(self):
+        """Block until all queued segment compressions have finished"""
+        self._compressor.submit(lambda: None).result()
+
+    def flush(self):
+        """Write pending changes of the hot segments to disk"""
+        with self._lock:
+            for segment in self.hot.values():
+                segment.flush()
+
+    def close(self):
+        """Finish pending compressions and flush the hot segments"""
+        self._compressor.shutdown(wait=True)
+        self.flush()
+
+    def __len__(self) -> int:
+        """Return the current size of the buffer"""
+        return self.size
+
+    def clear(self):
+        """Clear all experiences from the buffer and delete the segment files"""
+        with self._lock:
+            for segment_id in list(self.segment_ids):
+                self._remove_segment(segment_id)
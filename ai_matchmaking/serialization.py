@@ -0,0 +1,143 @@
+from typing import Any, Dict, List
+import json
+
+from fastapi import Response
+
+# orjson and msgpack are optional; fall back to the standard library encoder
+# and JSON-only responses when they are not installed
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# Field order of the columnar team arrays in MessagePack responses
+PLAYER_COLUMNS = ("id", "name", "position", "skillLevel", "winRate")
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson when available
+
+    The content must already be made of plain dicts, lists, strings and
+    numbers, so no pydantic validation or jsonable_encoder pass is needed.
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+class MsgPackResponse(Response):
+    """MessagePack response for clients that send Accept: application/x-msgpack"""
+
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def make_player(player_id: str, name: str, position: str,
+                skill_level: int, win_rate: float) -> Dict[str, Any]:
+    """Build a prevalidated player dict (id, name, position, skillLevel, winRate)"""
+    return {
+        "id": str(player_id),
+        "name": str(name),
+        "position": str(position),
+        "skillLevel": int(skill_level),
+        "winRate": float(win_rate)
+    }
+
+
+def make_match_quality(skill_balance: float, synergy: float, availability: float,
+                       location: float, position_balance: float) -> Dict[str, float]:
+    """Build a prevalidated match quality dict with scores on a 0-100 scale"""
+    return {
+        "skill_balance": float(skill_balance),
+        "synergy": float(synergy),
+        "availability": float(availability),
+        "location": float(location),
+        "position_balance": float(position_balance)
+    }
+
+
+def team_to_columns(team: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Convert a list of player dicts into one array per player field"""
+    return {column: [player[column] for player in team] for column in PLAYER_COLUMNS}
+
+
+def accept_quality(accept: str, media_type: str) -> float:
+    """Return the q-value an Accept header gives a media type (0 if not acceptable)
+
+    The most specific matching range wins: an exact type beats type/*, which
+    beats */*.
+    """
+    main_type = media_type.split("/")[0]
+    best_specificity, quality = -1, 0.0
+
+    for media_range in accept.lower().split(","):
+        params = [param.strip() for param in media_range.split(";")]
+        range_type = params[0]
+
+        if range_type == media_type:
+            specificity = 2
+        elif range_type == f"{main_type}/*":
+            specificity = 1
+        elif range_type == "*/*":
+            specificity = 0
+        else:
+            continue
+
+        range_quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    range_quality = float(value)
+                except ValueError:
+                    range_quality = 0.0
+
+        if specificity > best_specificity:
+            best_specificity, quality = specificity, range_quality
+
+    return quality
+
+
+def wants_msgpack(accept: str) -> bool:
+    """Return True if the Accept header prefers MessagePack and it can be served
+
+    JSON stays the default, so MessagePack is only chosen when its q-value is
+    positive and strictly higher than the one JSON gets.
+    """
+    if msgpack is None or not accept:
+        return False
+
+    msgpack_quality = accept_quality(accept, MSGPACK_MEDIA_TYPE)
+    return msgpack_quality > 0 and msgpack_quality > accept_quality(accept, JSON_MEDIA_TYPE)
+
+
+def render_matchmaking_response(content: Dict[str, Any], accept: str = "") -> Response:
+    """Encode a matchmaking result in the format negotiated via Accept
+
+    JSON responses keep the team_A/team_B lists of player objects. MessagePack
+    responses store each team as columnar arrays keyed by player field. Both
+    carry Vary: Accept so shared caches keep the two encodings apart.
+    """
+    headers = {"Vary": "Accept"}
+
+    if wants_msgpack(accept):
+        packed = dict(content)
+        packed["team_A"] = team_to_columns(content["team_A"])
+        packed["team_B"] = team_to_columns(content["team_B"])
+        return MsgPackResponse(packed, headers=headers)
+
+    return FastJSONResponse(content, headers=headers)
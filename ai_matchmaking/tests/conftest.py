@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the service modules (main.py, model_registry.py, ...) importable from tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,90 @@
+"""TensorFlow-free stand-in for the dqn_model module
+
+StubDQNModel does real CPU work while holding the GIL when it loads, warms up,
+trains and scores players, so tests notice if any of those block or corrupt
+concurrent /matchmake requests.
+"""
+import time
+
+import numpy as np
+
+STATE_SIZE = 20
+BATCH_SIZE = 4
+
+LOAD_SECONDS = 0.4     # CPU time to load and warm up a standby model
+TRAIN_SECONDS = 0.1    # CPU time of one training step
+PREDICT_SECONDS = 0.0005
+
+
+def burn_cpu(seconds: float):
+    """Busy-loop in pure Python, holding the GIL except at interpreter switch points"""
+    end = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+class StubDQNModel:
+    """Stand-in for DQNModel whose weights are a version label"""
+
+    def __init__(self, weights: str = "initial"):
+        self.weights = weights
+        self.warm = False
+        self.player_states = {}
+        self.mock_players = {}
+
+    def save_weights(self, filepath: str):
+        with open(filepath, "w") as f:
+            f.write(self.weights)
+
+    def load_weights(self, filepath: str):
+        burn_cpu(LOAD_SECONDS / 2)
+        with open(filepath) as f:
+            self.weights = f.read()
+
+    def load_weights_if_exists(self, filepath: str):
+        return False
+
+    def copy_weights_from(self, other: "StubDQNModel"):
+        self.weights = other.weights
+
+    def warm_up(self):
+        burn_cpu(LOAD_SECONDS / 2)
+        self.warm = True
+
+    def train(self, replay_buffer):
+        burn_cpu(TRAIN_SECONDS)
+        self.weights += "+t"
+
+    def create_state_vector(self, player_id, skill_level, sport, location, availability):
+        return np.zeros(STATE_SIZE)
+
+    def get_player_state(self, player_id, sport):
+        return np.zeros(STATE_SIZE)
+
+    def update_player_state(self, player_id, sport, reward, teammates, opponents):
+        return np.zeros(STATE_SIZE)
+
+    def get_compatible_teammates(self, state):
+        if not self.warm and self.weights != "initial":
+            raise RuntimeError("Serving a model that was not warmed up")
+
+        weights = self.weights
+        teammates = []
+        for i in range(10):
+            burn_cpu(PREDICT_SECONDS)
+            if self.weights != weights:
+                raise RuntimeError("Model weights changed while scoring players")
+            teammates.append({
+                "playerId": f"player_{i}",
+                "name": f"Player {i}",
+                "skillLevel": 3,
+                "compatibility": 0.8,
+                "sport": "Football"
+            })
+
+        return teammates, 0.8
+
+
+DQNModel = StubDQNModel
@@ -0,0 +1,127 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import stubs
+from stubs import LOAD_SECONDS, StubDQNModel
+
+MATCHMAKE_REQUEST = {
+    "playerId": "player_1",
+    "skillLevel": 3,
+    "sport": "Football",
+    "location": "Mumbai",
+    "availability": "Flexible"
+}
+UPDATE_REQUEST = {
+    "playerId": "player_1",
+    "matchId": "match_1",
+    "reward": 1.0,
+    "sport": "Football",
+    "teammates": ["player_2"],
+    "opponents": ["player_3"]
+}
+# A request must never wait for a model load; it may only share the CPU with it
+MAX_LATENCY = LOAD_SECONDS / 2
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Run main.app against the stub model, with models/ and replay data under tmp_path"""
+    monkeypatch.setitem(sys.modules, "dqn_model", stubs)
+    monkeypatch.setenv("REPLAY_BUFFER_DIR", str(tmp_path / "replay_data"))
+    monkeypatch.setenv("MODEL_WATCH_INTERVAL", "0")
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models")
+
+    sys.modules.pop("main", None)
+    main = importlib.import_module("main")
+    with TestClient(main.app) as client:
+        yield main, client
+    sys.modules.pop("main", None)
+
+
+def write_checkpoint(main, version: int, weights: str):
+    StubDQNModel(weights).save_weights(main.model_registry.checkpoint_path(version))
+
+
+def matchmake_while(client, action):
+    """Send /matchmake requests back to back while action runs on another thread
+
+    Returns the action's response plus the status codes and latencies of the
+    requests that overlapped with it.
+    """
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("response", action()))
+    statuses, latencies = [], []
+
+    worker.start()
+    while worker.is_alive():
+        start = time.perf_counter()
+        response = client.post("/matchmake", json=MATCHMAKE_REQUEST)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status_code)
+    worker.join()
+
+    return result["response"], statuses, latencies
+
+
+def test_matchmake_keeps_flowing_during_reload(service):
+    main, client = service
+    write_checkpoint(main, 1, "v1")
+
+    response, statuses, latencies = matchmake_while(
+        client, lambda: client.post("/models/reload", json={})
+    )
+
+    assert response.status_code == 200
+    assert response.json()["active_version"] == 1
+    assert main.model_registry.active.weights == "v1"
+    assert len(statuses) >= 5
+    assert set(statuses) == {200}
+    assert max(latencies) < MAX_LATENCY
+
+
+def test_matchmake_keeps_flowing_during_rollback(service):
+    main, client = service
+    write_checkpoint(main, 1, "v1")
+    write_checkpoint(main, 2, "v2")
+    client.post("/models/reload", json={"version": 1})
+    client.post("/models/reload", json={"version": 2})
+
+    def rollback_then_reload():
+        response = client.post("/models/rollback")
+        # Keep the load going across a full reload back to v2 as well
+        client.post("/models/reload", json={"version": 2})
+        return response
+
+    response, statuses, latencies = matchmake_while(client, rollback_then_reload)
+
+    assert response.status_code == 200
+    assert response.json()["active_version"] == 1
+    assert set(statuses) == {200}
+    assert max(latencies) < MAX_LATENCY
+
+
+def test_training_never_changes_the_served_model(service):
+    main, client = service
+    served = main.model_registry.active
+
+    def updates():
+        responses = [client.post("/update", json=UPDATE_REQUEST)
+                     for _ in range(stubs.BATCH_SIZE + 3)]
+        return responses
+
+    responses, statuses, latencies = matchmake_while(client, updates)
+
+    assert {r.status_code for r in responses} == {200}
+    # Stub scoring fails with 500 if weights change mid-request
+    assert set(statuses) == {200}
+    assert max(latencies) < MAX_LATENCY
+    assert served.weights == "initial"
+    assert main.model_registry.active.weights.startswith("initial+t")
+    assert main.model_registry.active_version == 4
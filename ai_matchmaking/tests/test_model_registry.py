@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+from stubs import LOAD_SECONDS, StubDQNModel
+
+
+def write_checkpoint(registry: ModelRegistry, version: int, weights: str):
+    """Write a checkpoint the way an external training process should: temp file, then rename"""
+    path = registry.checkpoint_path(version)
+    StubDQNModel(weights).save_weights(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(models_dir=str(tmp_path), model_factory=StubDQNModel,
+                             initial_model=StubDQNModel())
+    yield registry
+    registry.stop_watching()
+
+
+def test_reload_swaps_in_warm_standby(registry):
+    initial = registry.active
+    write_checkpoint(registry, 1, "v1")
+
+    assert registry.reload() == 1
+    assert registry.active.weights == "v1"
+    assert registry.active.warm
+    assert registry.previous is initial
+    # The served model shares player data with the model it replaced
+    assert registry.active.player_states is initial.player_states
+
+
+def test_save_does_not_wait_for_reload(registry):
+    write_checkpoint(registry, 1, "v1")
+    reloader = threading.Thread(target=registry.reload, args=(1,))
+    reloader.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    assert registry.save() == 2
+    elapsed = time.perf_counter() - start
+    reloader.join()
+
+    assert elapsed < LOAD_SECONDS / 4
+    assert registry.active.weights == "v1"
+
+
+def test_rollback_to_previous_model(registry):
+    write_checkpoint(registry, 1, "v1")
+    write_checkpoint(registry, 2, "v2")
+    registry.reload(1)
+    registry.reload(2)
+
+    assert registry.rollback() == 1
+    assert registry.active.weights == "v1"
+    assert registry.previous_version == 2
+
+
+def test_rollback_without_previous_version_fails(registry):
+    with pytest.raises(ValueError):
+        registry.rollback()
+
+
+def test_watcher_loads_new_checkpoints_and_keeps_rollback(registry):
+    registry.start_watching(interval=0.02)
+
+    write_checkpoint(registry, 1, "v1")
+    time.sleep(LOAD_SECONDS + 0.2)
+    write_checkpoint(registry, 2, "v2")
+    time.sleep(LOAD_SECONDS + 0.2)
+    assert registry.active_version == 2
+
+    assert registry.rollback() == 1
+    # Several watcher polls later the rollback still holds
+    time.sleep(0.2)
+    assert registry.active_version == 1
+
+    # A genuinely new checkpoint is still picked up
+    write_checkpoint(registry, 3, "v3")
+    time.sleep(LOAD_SECONDS + 0.2)
+    assert registry.active_version == 3
+
+
+def test_rollback_refused_while_watcher_has_pending_checkpoint(registry):
+    write_checkpoint(registry, 1, "v1")
+    write_checkpoint(registry, 2, "v2")
+    registry.reload(1)
+    registry.reload(2)
+    registry.start_watching(interval=60)
+
+    write_checkpoint(registry, 3, "v3")
+    with pytest.raises(ValueError):
+        registry.rollback()
+    assert registry.active_version == 2
+
+
+def test_saves_are_versioned_and_pruned(tmp_path):
+    registry = ModelRegistry(models_dir=str(tmp_path), model_factory=StubDQNModel,
+                             initial_model=StubDQNModel(), keep_versions=2)
+    write_checkpoint(registry, 1, "v1")
+    write_checkpoint(registry, 2, "v2")
+    registry.reload(1)
+    registry.reload(2)
+
+    versions = [registry.save() for _ in range(4)]
+
+    assert versions == [3, 4, 5, 6]
+    # Last two versions plus the previous model's checkpoint
+    assert registry.list_versions() == [1, 5, 6]
+
+
+def test_save_skips_model_that_was_swapped_out(registry):
+    stale = registry.active
+    write_checkpoint(registry, 1, "v1")
+    registry.reload(1)
+
+    assert registry.save(stale) is None
+    assert registry.list_versions() == [1]
+
+
+def test_train_swaps_in_trained_copy(registry):
+    write_checkpoint(registry, 1, "v1")
+    write_checkpoint(registry, 2, "v2")
+    registry.reload(1)
+    registry.reload(2)
+    served = registry.active
+
+    assert registry.train(lambda model: model.train(None)) == 3
+
+    # The model that was being served is untouched; the trained copy replaced it
+    assert served.weights == "v2"
+    assert registry.active.weights == "v2+t"
+    assert registry.active.warm
+    assert registry.active.player_states is served.player_states
+    # Training steps do not move the rollback target
+    assert registry.previous_version == 1
+    with open(registry.checkpoint_path(3)) as f:
+        assert f.read() == "v2+t"
+
+
+def test_train_result_discarded_after_concurrent_reload(registry):
+    write_checkpoint(registry, 1, "v1")
+
+    def train_while_reloading(model):
+        registry.reload(1)
+        model.train(None)
+
+    assert registry.train(train_while_reloading) is None
+    assert registry.active.weights == "v1"
+    assert registry.list_versions() == [1]
+
+
+class SlowSavingModel(StubDQNModel):
+    """Writes its checkpoint slowly, leaving a partial file on disk for a while"""
+
+    def save_weights(self, filepath: str):
+        with open(filepath, "w") as f:
+            f.write(self.weights[:1])
+            f.flush()
+            time.sleep(0.2)
+            f.write(self.weights[1:])
+
+
+def test_watcher_ignores_checkpoints_this_process_is_writing(tmp_path):
+    registry = ModelRegistry(models_dir=str(tmp_path), model_factory=SlowSavingModel,
+                             initial_model=SlowSavingModel())
+    registry.start_watching(interval=0.01)
+    try:
+        assert registry.train(lambda model: model.train(None)) == 1
+        time.sleep(0.1)
+    finally:
+        registry.stop_watching()
+
+    # No reload of our own (possibly partial) checkpoint replaced the trained model
+    assert registry.active.weights == "initial+t"
+    assert registry.previous is None
+    assert os.listdir(tmp_path) == ["dqn_model_v000001.weights.h5"]
@@ -0,0 +1,136 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from replay_buffer import PersistentReplayBuffer
+
+STATE_SIZE = 4
+
+
+def make_buffer(directory, **kwargs):
+    options = dict(capacity=1000, state_size=STATE_SIZE, segment_size=100,
+                   hot_segments=2, chunk_size=16)
+    options.update(kwargs)
+    return PersistentReplayBuffer(str(directory), **options)
+
+
+def fill(buffer, start, stop):
+    """Add experiences whose state, reward and next state all encode their index"""
+    for i in range(start, stop):
+        state = np.full(STATE_SIZE, i, dtype=np.float32)
+        buffer.add(state, i % 2, float(i), state + 1, i % 3 == 0)
+
+
+def assert_consistent(batch):
+    states, actions, rewards, next_states, dones = batch
+    assert (states[:, 0] == rewards).all()
+    assert (next_states[:, 0] == rewards + 1).all()
+    assert (actions == rewards.astype(np.int64) % 2).all()
+    assert (dones == (rewards.astype(np.int64) % 3 == 0)).all()
+
+
+@pytest.fixture
+def buffer(tmp_path):
+    buffer = make_buffer(tmp_path)
+    yield buffer
+    buffer.close()
+
+
+def test_sample_reads_hot_and_cold_segments(buffer, tmp_path):
+    fill(buffer, 0, 550)
+    buffer.wait_for_compression()
+
+    files = sorted(os.listdir(tmp_path))
+    assert files[:4] == [f"segment_{i:08d}_100.chunks" for i in range(4)]
+    assert files[4:] == ["segment_00000004.npy", "segment_00000005.npy"]
+
+    batch = buffer.sample(550)
+    assert_consistent(batch)
+    assert sorted(batch[2].tolist()) == list(range(550))
+
+
+def test_restart_reloads_all_experiences(tmp_path):
+    buffer = make_buffer(tmp_path)
+    fill(buffer, 0, 350)
+    buffer.close()
+
+    reloaded = make_buffer(tmp_path)
+    assert len(reloaded) == 350
+    fill(reloaded, 350, 420)
+    assert sorted(reloaded.sample(420)[2].tolist()) == list(range(420))
+    reloaded.close()
+
+
+def test_restart_discards_interrupted_compression(tmp_path):
+    buffer = make_buffer(tmp_path, hot_segments=10)
+    fill(buffer, 0, 250)
+    buffer.close()
+    open(os.path.join(tmp_path, "segment_00000000_100.chunks.tmp"), "wb").close()
+    open(os.path.join(tmp_path, "segment_00000000_100.chunks"), "wb").close()
+
+    reloaded = make_buffer(tmp_path, hot_segments=10)
+    assert len(reloaded) == 250
+    assert_consistent(reloaded.sample(250))
+    assert "segment_00000000_100.chunks.tmp" not in os.listdir(tmp_path)
+    reloaded.close()
+
+
+def test_evicts_oldest_segments_beyond_capacity(tmp_path):
+    buffer = make_buffer(tmp_path, capacity=300)
+    fill(buffer, 0, 1000)
+    buffer.wait_for_compression()
+
+    assert 300 <= len(buffer) <= 400
+    rewards = buffer.sample(len(buffer))[2]
+    assert rewards.min() >= 600
+    assert len(os.listdir(tmp_path)) == len(buffer.segment_ids)
+    buffer.close()
+
+
+def test_max_age_evicts_without_new_segments(tmp_path):
+    buffer = make_buffer(tmp_path, max_age=0.05)
+    fill(buffer, 0, 150)
+    time.sleep(0.1)
+
+    # No rollover happens here, the age limit is checked by sample() itself
+    rewards = buffer.sample(100)[2]
+    assert len(buffer) == 50
+    assert rewards.min() >= 100
+    buffer.close()
+
+
+def test_capacity_bounds_segment_size(tmp_path):
+    buffer = make_buffer(tmp_path, capacity=10, segment_size=100)
+    fill(buffer, 0, 200)
+
+    assert buffer.segment_size == 10
+    assert 10 <= len(buffer) <= 19
+    assert buffer.sample(len(buffer))[2].min() >= 180
+    buffer.close()
+
+
+def test_restart_keeps_segment_age(tmp_path):
+    buffer = make_buffer(tmp_path)
+    fill(buffer, 0, 101)
+    time.sleep(0.3)
+    # Segment 0 is compressed now, well after it was filled
+    fill(buffer, 101, 201)
+    buffer.wait_for_compression()
+    buffer.close()
+    assert "segment_00000000_100.chunks" in os.listdir(tmp_path)
+
+    reloaded = make_buffer(tmp_path, max_age=0.2)
+    assert len(reloaded) == 101
+    assert reloaded.sample(101)[2].min() >= 100
+    reloaded.close()
+
+
+def test_clear_removes_segment_files(buffer, tmp_path):
+    fill(buffer, 0, 450)
+    buffer.clear()
+    buffer.wait_for_compression()
+
+    assert len(buffer) == 0
+    assert os.listdir(tmp_path) == []
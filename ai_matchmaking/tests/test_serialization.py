@@ -0,0 +1,72 @@
+import json
+
+import msgpack
+import pytest
+
+from serialization import (
+    JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, PLAYER_COLUMNS, accept_quality,
+    make_match_quality, make_player, render_matchmaking_response, wants_msgpack
+)
+
+
+def make_content():
+    team = [make_player(f"player_{i}", f"Player {i}", "Forward", i % 5 + 1, 0.5 + i / 100)
+            for i in range(6)]
+    return {
+        "team_A": team[:3],
+        "team_B": team[3:],
+        "confidence_score": 87.5,
+        "match_quality": make_match_quality(92.0, 78.5, 100.0, 100.0, 88.1),
+        "explanation": "Teams are well-balanced by skill."
+    }
+
+
+def columns_to_team(columns):
+    """Expand columnar teams the way services/matchmakingService.js does"""
+    count = len(columns[PLAYER_COLUMNS[0]])
+    return [{column: columns[column][i] for column in PLAYER_COLUMNS} for i in range(count)]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/x-msgpack", True),
+    ("application/x-msgpack, application/json;q=0.9", True),
+    ("application/x-msgpack;q=0", False),
+    ("application/x-msgpack;q=0.5, application/json", False),
+    ("*/*", False),
+    ("application/json", False),
+    ("application/*, application/x-msgpack;q=0", False),
+    ("", False),
+    (None, False),
+])
+def test_wants_msgpack(accept, expected):
+    assert wants_msgpack(accept) is expected
+
+
+def test_exact_type_beats_wildcards():
+    accept = "*/*;q=0.1, application/*;q=0.2, application/x-msgpack;q=0.7"
+    assert accept_quality(accept, MSGPACK_MEDIA_TYPE) == 0.7
+    assert accept_quality(accept, JSON_MEDIA_TYPE) == 0.2
+    assert accept_quality("text/html", JSON_MEDIA_TYPE) == 0.0
+
+
+def test_json_response_keeps_player_lists():
+    content = make_content()
+    response = render_matchmaking_response(content, None)
+
+    assert response.media_type == JSON_MEDIA_TYPE
+    assert response.headers["vary"] == "Accept"
+    assert json.loads(response.body) == content
+
+
+def test_msgpack_columns_round_trip_to_player_lists():
+    content = make_content()
+    response = render_matchmaking_response(content, MSGPACK_MEDIA_TYPE)
+
+    assert response.media_type == MSGPACK_MEDIA_TYPE
+    assert response.headers["vary"] == "Accept"
+
+    decoded = msgpack.unpackb(response.body)
+    assert decoded["team_A"]["id"] == ["player_0", "player_1", "player_2"]
+    decoded["team_A"] = columns_to_team(decoded["team_A"])
+    decoded["team_B"] = columns_to_team(decoded["team_B"])
+    assert decoded == json.loads(render_matchmaking_response(content).body)
@@ -7,6 +7,63 @@ dotenv.config();
 // Get AI service URL from environment variables or use default
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
 
+// Optional MessagePack decoder. @msgpack/msgpack is opt-in and not listed in
+// package.json: once installed (npm install @msgpack/msgpack) the client asks
+// the AI service for compact binary /matchmake responses, otherwise JSON.
+let msgpackDecode = null;
+try {
+  ({ decode: msgpackDecode } = await import('@msgpack/msgpack'));
+} catch (error) {
+  msgpackDecode = null;
+}
+
+/**
+ * Expand a columnar team ({ id: [...], name: [...], ... }) into player objects
+ * @param {Object} columns - One array per player field
+ * @returns {Array<Object>} List of players
+ */
+const columnsToPlayers = (columns) => {
+  const fields = Object.keys(columns);
+  const count = fields.length ? columns[fields[0]].length : 0;
+  return Array.from({ length: count }, (_, i) =>
+    Object.fromEntries(fields.map((field) => [field, columns[field][i]]))
+  );
+};
+
+/**
+ * Decode a /matchmake response body according to its content type
+ * @param {Object} response - Axios response with an arraybuffer body
+ * @returns {Object} Matchmaking result with team_A/team_B as player lists
+ */
+const decodeMatchmakingResponse = (response) => {
+  const contentType = response.headers['content-type'] || '';
+  const body = Buffer.from(response.data);
+  if (msgpackDecode && contentType.includes('application/x-msgpack')) {
+    const data = msgpackDecode(body);
+    data.team_A = columnsToPlayers(data.team_A);
+    data.team_B = columnsToPlayers(data.team_B);
+    return data;
+  }
+  return JSON.parse(body.toString('utf8'));
+};
+
+/**
+ * Decode an arraybuffer error body so FastAPI's error detail stays readable in logs
+ * @param {ArrayBuffer|Object} data - Error response body
+ * @returns {Object|string} Parsed JSON body, or the raw text if it is not JSON
+ */
+const decodeErrorBody = (data) => {
+  if (!(data instanceof ArrayBuffer) && !Buffer.isBuffer(data)) {
+    return data;
+  }
+  const text = Buffer.from(data).toString('utf8');
+  try {
+    return JSON.parse(text);
+  } catch (parseError) {
+    return text;
+  }
+};
+
 /**
  * Service for interacting with the FastAPI AI matchmaking service
  */
@@ -51,14 +108,19 @@ const matchmakingService = {
     try {
       console.log(`Sending matchmaking request to ${AI_SERVICE_URL}/matchmake with data:`, playerData);
       const response = await axios.post(`${AI_SERVICE_URL}/matchmake`, playerData, {
-        timeout: 8000 // 8 second timeout for potentially longer AI processing
+        timeout: 8000, // 8 second timeout for potentially longer AI processing
+        responseType: 'arraybuffer',
+        headers: {
+          Accept: msgpackDecode ? 'application/x-msgpack, application/json;q=0.9' : 'application/json'
+        }
       });
-      console.log('Matchmaking response received:', response.data);
-      return response.data;
+      const data = decodeMatchmakingResponse(response);
+      console.log('Matchmaking response received:', data);
+      return data;
     } catch (error) {
       console.error('Error getting match recommendations:', error.message);
       if (error.response) {
-        console.error('Error response:', error.response.data);
+        console.error('Error response:', decodeErrorBody(error.response.data));
         console.error('Error status:', error.response.status);
       } else if (error.code === 'ECONNREFUSED') {
         console.error('Connection refused. Is the FastAPI service running?');